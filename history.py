@@ -0,0 +1,200 @@
+# Standard library imports - for the per-session message store and the in-memory window
+import sqlite3
+import time
+from collections import deque
+from pathlib import Path
+
+# Older messages are spilled to a small SQLite file next to the agent's own session store (tmp/agent.db)
+store_path = Path(__file__).parent.absolute() / "tmp" / "chat_history.db"
+STORE_VERSION = 2       # Bumped when the store layout changes; older stores are discarded
+STORE_TTL_HOURS = 6     # Sessions without a new message for this long are deleted (closed tabs never clear themselves)
+
+WINDOW_SIZE = 20      # Messages kept in memory and rendered on every rerun
+PAGE_SIZE = 10        # Messages added per "Load earlier messages" click
+EARLIER_SHOWN = 30    # Most spilled messages rendered at once; paging further back slides this range
+CONTEXT_RECENT = 5    # Latest messages passed to the LLM word for word (what the FAQ follow-up path always used)
+CONTEXT_OLDER = 10    # Messages before those, passed in condensed form
+CONDENSED_CHARS = 300 # Condensed messages are cut to this length
+
+
+def _condense(text):
+    """Collapse whitespace and shorten an older message for the chat context."""
+    text = " ".join(text.split())
+    return text if len(text) <= CONDENSED_CHARS else text[:CONDENSED_CHARS].rstrip() + "..."
+
+
+class ChatHistory:
+    """
+    Chat history for one Streamlit session with bounded memory use.
+
+    - The last `window_size` messages live in memory and are rendered on every rerun.
+    - Older messages are spilled to a per-session SQLite store and only read back
+      when the user asks for earlier messages. Starting a session deletes every
+      session that has been idle for `STORE_TTL_HOURS`, so the store stays bounded
+      and chat contents (patient names, phone numbers) are not kept indefinitely.
+    - `context` is the chat history handed to the LLM: the last `CONTEXT_RECENT`
+      messages in full, preceded by up to `CONTEXT_OLDER` earlier ones cut to
+      `CONDENSED_CHARS`. It is a bounded transcript tail, not an LLM-written summary,
+      and is updated once per new message so the FAQ follow-up path does not
+      rebuild it from the raw messages each turn.
+    """
+
+    def __init__(self, session_id: str, window_size: int = WINDOW_SIZE, path: Path = store_path):
+        self.session_id = session_id
+        self.path = path
+        self.window = deque(maxlen=window_size)
+        self.spilled = 0  # Number of this session's messages in the store
+        self.context = ""
+        self._recent_lines = deque()
+        self._older_lines = deque(maxlen=CONTEXT_OLDER)
+        self._prune_stale_sessions()
+
+    def _connect(self):
+        """Open the store (creating it on first use). A fresh connection per call keeps it safe across Streamlit threads."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < STORE_VERSION:
+            # New file, or one with an older layout: it only holds scratch copies, so start over
+            conn.execute("DROP TABLE IF EXISTS messages")
+            conn.execute("DROP TABLE IF EXISTS sessions")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")  # auto_vacuum only takes effect once the file is rebuilt
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "session_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL, "
+                "PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)")
+            conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        return conn
+
+    def _prune_stale_sessions(self):
+        """Delete the spilled messages of every session idle for longer than the TTL and give the space back."""
+        cutoff = time.time() - STORE_TTL_HOURS * 3600
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE last_seen < ?)",
+                    (cutoff,),
+                )
+                conn.execute("DELETE FROM sessions WHERE last_seen < ?", (cutoff,))
+            conn.executescript("PRAGMA incremental_vacuum;")  # executescript steps it to completion (execute frees one page)
+        finally:
+            conn.close()
+
+    @property
+    def last(self):
+        """The most recent message, or None if the chat is empty."""
+        return self.window[-1] if self.window else None
+
+    def append(self, role: str, content: str):
+        """
+        Add a message to the chat.
+
+        Args:
+            role: "user" or "assistant"
+            content: The message text (markdown)
+        """
+        # Every message marks the session as active; if the window is full, the oldest message
+        # is about to drop out of memory, so it is stored in the same transaction
+        self._record(self.window[0] if len(self.window) == self.window.maxlen else None)
+        self.window.append({"role": role, "content": content})
+
+        # Messages leaving the verbatim tail are kept in condensed form (the deque drops the oldest of those)
+        self._recent_lines.append((role, content))
+        if len(self._recent_lines) > CONTEXT_RECENT:
+            old_role, old_content = self._recent_lines.popleft()
+            self._older_lines.append(f"{old_role}: {_condense(old_content)}")
+        self.context = "\n".join([*self._older_lines, *(f"{r}: {c}" for r, c in self._recent_lines)])
+
+    def _record(self, spill=None):
+        """
+        Update the session's last-seen time and, if given, move the `spill` message to the store.
+        A session missing from the store is new or was pruned after idling past the TTL;
+        in the latter case its spilled messages are gone, so `spilled` starts over.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                now = time.time()
+                if conn.execute(
+                    "UPDATE sessions SET last_seen = ? WHERE session_id = ?", (now, self.session_id)
+                ).rowcount == 0:
+                    self.spilled = 0
+                    conn.execute("INSERT INTO sessions (session_id, last_seen) VALUES (?, ?)", (self.session_id, now))
+                if spill is not None:
+                    conn.execute(
+                        "INSERT INTO messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                        (self.session_id, self.spilled, spill["role"], spill["content"]),
+                    )
+        finally:
+            conn.close()
+        if spill is not None:
+            self.spilled += 1
+
+    def earlier_page_start(self, first_seq):
+        """
+        Where the loaded range starts after one more "Load earlier messages" click.
+
+        Args:
+            first_seq: Oldest spilled message currently shown, or None if none are shown
+
+        Returns:
+            The new oldest seq to show, `PAGE_SIZE` messages further back
+        """
+        start = self.spilled if first_seq is None else first_seq
+        return max(0, start - PAGE_SIZE)
+
+    def later_page_start(self, first_seq):
+        """Where the loaded range starts after a "Show later messages" click (`PAGE_SIZE` further forward)."""
+        return min(first_seq + PAGE_SIZE, max(0, self.spilled - EARLIER_SHOWN))
+
+    def load_earlier(self, first_seq):
+        """
+        Read back at most `EARLIER_SHOWN` spilled messages starting at `first_seq`, oldest first,
+        so a rerun never renders more than the window plus this range.
+
+        Args:
+            first_seq: Oldest spilled message to show, or None to show none
+
+        Returns:
+            List of {"role", "content"} dicts that precede the in-memory window
+        """
+        if first_seq is None or self.spilled == 0:
+            return []
+        self._record()  # Paging back counts as activity, and notices if the store was pruned meanwhile
+        if self.spilled == 0:
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (self.session_id, first_seq, first_seq + EARLIER_SHOWN),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def has_earlier(self, first_seq):
+        """True if there are spilled messages older than the loaded range."""
+        return self.spilled > 0 and (first_seq is None or first_seq > 0)
+
+    def has_later(self, first_seq):
+        """True if spilled messages sit between the loaded range and the in-memory window."""
+        return first_seq is not None and first_seq + EARLIER_SHOWN < self.spilled
+
+    def clear(self):
+        """Forget the whole conversation, including anything spilled to the store."""
+        if self.spilled:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM messages WHERE session_id = ?", (self.session_id,))
+            finally:
+                conn.close()
+        self.window.clear()
+        self.spilled = 0
+        self.context = ""
+        self._recent_lines.clear()
+        self._older_lines.clear()
@@ -5,6 +5,7 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from faq import generate_faq_response
 from sql import handling_agent
+from history import ChatHistory
 from dotenv import load_dotenv
 import uuid
 import os
@@ -24,8 +25,10 @@ if "session_id" not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
 if "last_active_route" not in st.session_state:
     st.session_state.last_active_route = None
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+if "history" not in st.session_state:
+    st.session_state.history = ChatHistory(st.session_state.session_id)
+if "history_first_seq" not in st.session_state:
+    st.session_state.history_first_seq = None  # Oldest earlier (spilled) message shown, None if none are
 
 # --- LLM SETUP ---
 template = """
@@ -85,8 +88,7 @@ def ask(query: str, session_id: str):
                 return handling_agent(query, session_id)
             
             elif st.session_state.last_active_route == "faq":
-                history_context = "\n".join([f"{m['role']}: {m['content']}" for m in st.session_state.messages[-5:]])
-                return generate_faq_response(query, chat_history=history_context)
+                return generate_faq_response(query, chat_history=st.session_state.history.context)
             
             else:
                 # Fallback to polite refusal/greeting (returns a LangChain stream)
@@ -95,7 +97,8 @@ def ask(query: str, session_id: str):
 
 # --- CALLBACK FOR SIDEBAR BUTTONS ---
 def handle_quick_query(query_text):
-    st.session_state.messages.append({"role": "user", "content": query_text})
+    st.session_state.history.append("user", query_text)
+    st.session_state.history_first_seq = None  # A new turn collapses the earlier messages again
     st.rerun()
 
 # --- SIDEBAR UI ---
@@ -108,28 +111,48 @@ with st.sidebar:
         handle_quick_query("I want to book an appointment.")
     st.divider()
     if st.button("🗑️ Clear Chat History", type="secondary"):
-        st.session_state.messages = []
+        st.session_state.history.clear()
+        st.session_state.history_first_seq = None
         st.session_state.last_active_route = None
         st.rerun()
 
 # --- MAIN CHAT UI ---
 st.title("🏥 Apollo Hospital AI Assistant")
 
+history = st.session_state.history
+
+# Older messages are only read back from the store when asked for, a bounded page at a time
+first_seq = st.session_state.history_first_seq
+if history.has_earlier(first_seq):
+    if st.button("⬆️ Load earlier messages"):
+        st.session_state.history_first_seq = history.earlier_page_start(first_seq)
+        st.rerun()
+
 # Display historical messages
-for message in st.session_state.messages:
+for message in history.load_earlier(first_seq):
+    with st.chat_message(message["role"]):
+        st.markdown(message["content"])
+
+if history.has_later(first_seq):
+    if st.button("⬇️ Show later messages"):
+        st.session_state.history_first_seq = history.later_page_start(first_seq)
+        st.rerun()
+
+for message in history.window:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
 # Handle User Input
 query = st.chat_input("Ask about specialized care, or hospital FAQs...")
 
-if query or (len(st.session_state.messages) > 0 and st.session_state.messages[-1]["role"] == "user"):
+if query or (history.last is not None and history.last["role"] == "user"):
     if query:
         with st.chat_message("user"):
             st.markdown(query)
-        st.session_state.messages.append({"role": "user", "content": query})
+        history.append("user", query)
+        st.session_state.history_first_seq = None  # A new turn collapses the earlier messages again
     else:
-        query = st.session_state.messages[-1]["content"]
+        query = history.last["content"]
 
     # Assistant Response
     with st.chat_message("assistant"):
@@ -137,4 +160,4 @@ if query or (len(st.session_state.messages) > 0 and st.session_state.messages[-1
         # Streams the response word by word
         full_response = st.write_stream(response_generator(response_obj))
         
-    st.session_state.messages.append({"role": "assistant", "content": full_response})
\ No newline at end of file
+    history.append("assistant", full_response)
\ No newline at end of file
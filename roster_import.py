@@ -0,0 +1,460 @@
+# Standard library imports - for the command line interface, file paths and the SQLite connection
+import argparse
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+# Data handling - for streaming roster files in chunks and validating them column-wise
+import pandas as pd
+
+# Set up the path to the SQLite database that stores appointment information (same file as sql.py)
+current_dir = Path(__file__).parent.absolute()
+db_path = current_dir / "data" / "appointment_system.db"
+
+# Number of rows read, validated and written per transaction
+CHUNK_SIZE = 20_000
+
+# SQLite limits the number of "?" placeholders in a single statement, so IN (...) lookups are split
+LOOKUP_BATCH = 900
+
+# Valid values for the weekly schedule
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+TIME_PATTERN = r"(?:[01]\d|2[0-3]):[0-5]\d"  # 24-hour 'HH:MM', the format already used in the DB
+
+DOCTOR_COLUMNS = ["name", "nationality", "specialization"]
+SCHEDULE_COLUMNS = ["day_of_week", "start_time", "end_time", "duration_hours"]
+SLOT_KEY = ["doctor_id", "day_of_week", "start_time"]
+SUPERSEDED = "duplicate (superseded by later row)"
+
+# Upserts keep existing row ids, so appointments pointing at an availability_id stay valid
+UPSERT_DOCTOR = """
+    INSERT INTO doctors (name, nationality, specialization) VALUES (?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET
+        nationality = excluded.nationality,
+        specialization = excluded.specialization
+"""
+UPSERT_SLOT = """
+    INSERT INTO doctor_availability (doctor_id, day_of_week, start_time, end_time, duration_hours)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(doctor_id, day_of_week, start_time) DO UPDATE SET
+        end_time = excluded.end_time,
+        duration_hours = excluded.duration_hours
+"""
+
+
+# Unique keys the upserts rely on: (index name, table, columns)
+UNIQUE_KEYS = [
+    ("idx_doctors_name", "doctors", "name"),
+    ("idx_availability_slot", "doctor_availability", "doctor_id, day_of_week, start_time"),
+]
+
+
+def connect(path=db_path):
+    """
+    Open the appointment database and make sure the unique keys used by the upserts exist.
+    Doctors are identified by name, so the import refuses to run while two doctors share one.
+
+    Args:
+        path: Location of the SQLite database file
+
+    Returns:
+        An open sqlite3 connection
+
+    Raises:
+        ValueError: If existing rows already break one of the unique keys
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous = NORMAL")  # One fsync per batch is enough for a re-runnable import
+    for index, table, columns in UNIQUE_KEYS:
+        try:
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table}({columns})")
+        except sqlite3.IntegrityError:
+            duplicates = conn.execute(
+                f"SELECT {columns}, COUNT(*) FROM {table} GROUP BY {columns} HAVING COUNT(*) > 1 LIMIT 20"
+            ).fetchall()
+            conn.close()
+            listed = "; ".join(", ".join(str(v) for v in row[:-1]) + f" (x{row[-1]})" for row in duplicates)
+            raise ValueError(
+                f"Cannot import: {table} has rows sharing ({columns}), which the importer uses as a unique key. "
+                f"Make them distinct first. Duplicates: {listed}"
+            )
+    conn.commit()
+    return conn
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Stream a CSV or JSONL roster file as DataFrames of at most `chunk_size` rows.
+    Only one chunk is held in memory at a time.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    if suffix in (".jsonl", ".ndjson"):
+        return pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+    raise ValueError(f"Unsupported roster file type: {suffix} (expected .csv or .jsonl)")
+
+
+def _require_columns(chunk, columns):
+    """Fail fast if the file does not carry the columns we need."""
+    missing = [c for c in columns if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Roster file is missing columns: {', '.join(missing)}")
+
+
+def _text(series):
+    """Normalise a column to stripped strings (JSONL values may arrive as numbers or nulls)."""
+    return series.fillna("").astype(str).str.strip()
+
+
+def _flag(reasons, mask, reason):
+    """Record `reason` for rows in `mask` that have not already been rejected for something else."""
+    return reasons.mask(mask & reasons.eq(""), reason)
+
+
+def _flag_superseded(reasons, frame, key):
+    """
+    A key repeated within one chunk is an update of the same record: the last row wins,
+    and the earlier valid rows are reported as superseded rather than silently dropped.
+    """
+    valid = reasons.eq("")
+    superseded = frame[valid].duplicated(subset=key, keep="last").reindex(frame.index, fill_value=False)
+    return _flag(reasons, superseded, SUPERSEDED)
+
+
+def _to_minutes(times):
+    """Convert 'HH:MM' strings to minutes since midnight (NaN for anything malformed)."""
+    hours = pd.to_numeric(times.str.slice(0, 2), errors="coerce")
+    minutes = pd.to_numeric(times.str.slice(3, 5), errors="coerce")
+    return hours * 60 + minutes
+
+
+def validate_doctors(chunk):
+    """
+    Clean a chunk of doctor roster rows.
+
+    Returns:
+        (clean DataFrame, Series of rejection reasons for the rejected rows)
+    """
+    _require_columns(chunk, DOCTOR_COLUMNS)
+    frame = pd.DataFrame({c: _text(chunk[c]) for c in DOCTOR_COLUMNS}, index=chunk.index)
+
+    reasons = pd.Series("", index=frame.index)
+    for column in DOCTOR_COLUMNS:
+        reasons = _flag(reasons, frame[column].eq(""), f"missing {column}")
+
+    reasons = _flag_superseded(reasons, frame, "name")
+    clean = frame[reasons.eq("")]
+    return clean, reasons[reasons.ne("")]
+
+
+def _resolve_doctor_ids(conn, chunk):
+    """
+    Map the schedule rows to a doctor_id known to the database, using the `doctor_id`
+    column if the file has one and `doctor_name` otherwise. Unknown doctors become NaN.
+    """
+    if "doctor_id" in chunk.columns:
+        column, keys = "doctor_id", pd.to_numeric(chunk["doctor_id"], errors="coerce")
+        lookup = keys.dropna().astype(int).unique().tolist()
+    else:
+        _require_columns(chunk, ["doctor_name"])
+        column, keys = "name", _text(chunk["doctor_name"])
+        lookup = keys[keys.ne("")].unique().tolist()
+
+    ids = {}
+    for i in range(0, len(lookup), LOOKUP_BATCH):
+        batch = lookup[i:i + LOOKUP_BATCH]
+        placeholders = ",".join("?" * len(batch))
+        ids.update(conn.execute(
+            f"SELECT {column}, doctor_id FROM doctors WHERE {column} IN ({placeholders})", batch
+        ).fetchall())
+    return keys.map(ids)
+
+
+def _check_schedule_rows(conn, chunk):
+    """
+    Row-by-row checks on a chunk of weekly schedule rows: known doctor, valid weekday,
+    'HH:MM' times, end after start and `duration_hours` matching the interval.
+
+    Returns:
+        (clean DataFrame, Series of rejection reasons, "" for rows that passed)
+    """
+    _require_columns(chunk, SCHEDULE_COLUMNS)
+    frame = pd.DataFrame({
+        "doctor_id": _resolve_doctor_ids(conn, chunk),
+        "day_of_week": _text(chunk["day_of_week"]).str.title(),
+        "start_time": _text(chunk["start_time"]),
+        "end_time": _text(chunk["end_time"]),
+        "duration_hours": pd.to_numeric(chunk["duration_hours"], errors="coerce"),
+    }, index=chunk.index)
+    frame["start_min"] = _to_minutes(frame["start_time"])
+    frame["end_min"] = _to_minutes(frame["end_time"])
+
+    reasons = pd.Series("", index=frame.index)
+    reasons = _flag(reasons, frame["doctor_id"].isna(), "unknown doctor")
+    reasons = _flag(reasons, ~frame["day_of_week"].isin(DAYS_OF_WEEK), "invalid day_of_week")
+    reasons = _flag(reasons, ~frame["start_time"].str.fullmatch(TIME_PATTERN), "invalid start_time")
+    reasons = _flag(reasons, ~frame["end_time"].str.fullmatch(TIME_PATTERN), "invalid end_time")
+    reasons = _flag(reasons, frame["end_min"] <= frame["start_min"], "end_time not after start_time")
+    reasons = _flag(
+        reasons,
+        frame["duration_hours"].isna() | frame["duration_hours"].ne(frame["duration_hours"].round()),
+        "invalid duration_hours",
+    )
+    reasons = _flag(
+        reasons,
+        frame["duration_hours"] * 60 != frame["end_min"] - frame["start_min"],
+        "duration_hours does not match start/end",
+    )
+
+    reasons = _flag_superseded(reasons, frame, SLOT_KEY)
+
+    clean = frame[reasons.eq("")].copy()
+    clean["doctor_id"] = clean["doctor_id"].astype(int)
+    clean["duration_hours"] = clean["duration_hours"].astype(int)
+    return clean, reasons
+
+
+def validate_schedules(conn, chunk):
+    """
+    Clean a chunk of weekly schedule rows: the row checks of `_check_schedule_rows`,
+    plus no overlap with other slots of the same doctor on the same day
+    (in this chunk or already in the DB).
+
+    Returns:
+        (clean DataFrame, Series of rejection reasons for the rejected rows)
+    """
+    clean, reasons = _check_schedule_rows(conn, chunk)
+
+    overlapping = _find_overlaps(conn, clean)
+    reasons[overlapping] = "overlaps another slot"
+    clean = clean.drop(index=overlapping)
+
+    return clean, reasons[reasons.ne("")]
+
+
+def _existing_slots(conn, doctor_ids):
+    """Load the current weekly slots of the given doctors (bounded by the size of one chunk)."""
+    rows = []
+    for i in range(0, len(doctor_ids), LOOKUP_BATCH):
+        batch = doctor_ids[i:i + LOOKUP_BATCH]
+        placeholders = ",".join("?" * len(batch))
+        rows.extend(conn.execute(
+            "SELECT availability_id, doctor_id, day_of_week, start_time, end_time FROM doctor_availability "
+            f"WHERE doctor_id IN ({placeholders})", batch
+        ).fetchall())
+    frame = pd.DataFrame(rows, columns=["availability_id", "doctor_id", "day_of_week", "start_time", "end_time"])
+    return frame.astype({"availability_id": int, "doctor_id": int})
+
+
+# Replace mode: slots of doctors listed in the roster file (collected in the temp table roster_keys)
+# whose (doctor, day, start) key the file does not contain
+STALE_SLOTS = """
+    SELECT availability_id FROM doctor_availability a
+    WHERE a.doctor_id IN (SELECT doctor_id FROM roster_keys)
+      AND NOT EXISTS (SELECT 1 FROM roster_keys k WHERE k.doctor_id = a.doctor_id
+                      AND k.day_of_week = a.day_of_week AND k.start_time = a.start_time)
+"""
+# Upcoming appointments that are still booked. Cancelled and past appointments keep their
+# doctor, date and time, so they do not pin a slot.
+UPCOMING = "p.status = 'BOOKED' AND p.appointment_date >= date('now', 'localtime')"
+# Condition on doctor_availability a: the slot has an upcoming booked appointment
+BOOKED = f"EXISTS (SELECT 1 FROM appointments p WHERE p.availability_id = a.availability_id AND {UPCOMING})"
+
+# Number of kept slots listed individually in the summary
+KEPT_LISTED = 20
+
+
+def _replace_slots(conn, path, chunk_size, stats):
+    """
+    Replace mode: the file is the new weekly roster of every doctor it lists.
+
+    Runs as a first pass before the import. The (doctor, day, start) keys of every valid
+    row are collected in a temp table, so a doctor's rows may be anywhere in the file
+    and chunk boundaries do not matter. Then each listed doctor's slots that the file
+    does not contain are deleted, so moved slots no longer clash with the old ones.
+    Slots with upcoming booked appointments are kept; new rows that overlap them are
+    rejected by the overlap check.
+
+    Returns:
+        List of kept slots as (availability_id, doctor name, day, start, end, upcoming bookings)
+    """
+    with conn:
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS roster_keys (doctor_id INTEGER, day_of_week TEXT, start_time TEXT, "
+            "PRIMARY KEY (doctor_id, day_of_week, start_time)) WITHOUT ROWID"
+        )
+        conn.execute("DELETE FROM roster_keys")
+        for chunk in read_chunks(path, chunk_size):
+            clean, _ = _check_schedule_rows(conn, chunk)
+            conn.executemany(
+                "INSERT OR IGNORE INTO roster_keys VALUES (?, ?, ?)",
+                clean[SLOT_KEY].itertuples(index=False, name=None),
+            )
+
+        kept = conn.execute(
+            "SELECT a.availability_id, d.name, a.day_of_week, a.start_time, a.end_time, "
+            f"(SELECT COUNT(*) FROM appointments p WHERE p.availability_id = a.availability_id AND {UPCOMING}) "
+            "FROM doctor_availability a JOIN doctors d ON d.doctor_id = a.doctor_id "
+            f"WHERE a.availability_id IN ({STALE_SLOTS}) AND {BOOKED} ORDER BY d.name, a.availability_id"
+        ).fetchall()
+        stats["kept_booked"] += len(kept)
+        stats["removed"] += conn.execute(
+            "DELETE FROM doctor_availability WHERE availability_id IN "
+            f"(SELECT availability_id FROM doctor_availability a WHERE availability_id IN ({STALE_SLOTS}) AND NOT {BOOKED})"
+        ).rowcount
+        conn.execute("DELETE FROM roster_keys")
+    return kept
+
+
+def _find_overlaps(conn, clean):
+    """
+    Return the index labels of new rows whose interval overlaps any other slot of the
+    same doctor and weekday. Existing slots that share a (doctor, day, start) key with a
+    new row are left out, because the upsert will replace them.
+    """
+    if clean.empty:
+        return clean.index
+
+    existing = _existing_slots(conn, [int(d) for d in clean["doctor_id"].unique()])
+    existing = existing.merge(clean[SLOT_KEY], on=SLOT_KEY, how="left", indicator=True)
+    existing = existing[existing["_merge"] == "left_only"].drop(columns="_merge")
+    existing["start_min"] = _to_minutes(existing["start_time"])
+    existing["end_min"] = _to_minutes(existing["end_time"])
+    existing["row"] = None
+
+    new = clean[["doctor_id", "day_of_week", "start_min", "end_min"]].assign(row=clean.index)
+    slots = pd.concat([new, existing[new.columns]], ignore_index=True)
+    slots = slots.sort_values(["doctor_id", "day_of_week", "start_min"], kind="stable")
+
+    # Sorted by start time, a slot overlaps an earlier one if it starts before the latest earlier end,
+    # and overlaps a later one if it ends after the next slot starts
+    group = [slots["doctor_id"], slots["day_of_week"]]
+    latest_end = slots.groupby(group)["end_min"].cummax()
+    previous_end = latest_end.groupby(group).shift()
+    next_start = slots.groupby(group)["start_min"].shift(-1)
+    overlaps = (slots["start_min"] < previous_end) | (slots["end_min"] > next_start)
+
+    return pd.Index(slots.loc[overlaps & slots["row"].notna(), "row"].tolist())
+
+
+def _write_rejects(rejects_path, chunk, reasons, columns):
+    """
+    Append rejected rows (with their reason) to a CSV file so they can be fixed and re-imported.
+
+    Args:
+        columns: Header already written for this run, or None if nothing has been written yet.
+            Later chunks are aligned to it (JSONL lines may not all carry the same keys).
+
+    Returns:
+        The header of the rejects file
+    """
+    if rejects_path is None or reasons.empty:
+        return columns
+    rejected = chunk.loc[reasons.index].assign(reject_reason=reasons)
+    if columns is None:
+        rejected.to_csv(rejects_path, mode="a", index=False)
+        return list(rejected.columns)
+    rejected.reindex(columns=columns).to_csv(rejects_path, mode="a", index=False, header=False)
+    return columns
+
+
+def import_roster(kind, path, conn, chunk_size=CHUNK_SIZE, rejects_path=None, replace=False):
+    """
+    Stream a roster file into the appointment database.
+
+    Each chunk is validated and then upserted with `executemany` inside its own
+    transaction, so memory use is bounded by `chunk_size` and an interrupted import
+    can simply be run again.
+
+    Args:
+        kind: "doctors" for the doctor roster, "schedules" for weekly availability
+        path: CSV or JSONL file to import
+        conn: Connection returned by `connect()`
+        chunk_size: Rows per chunk / transaction
+        rejects_path: Optional CSV file that receives the rejected rows (overwritten on each run)
+        replace: For schedules, treat the file as the complete weekly roster of each doctor
+            it lists and remove their other slots first (see `_replace_slots`)
+
+    Returns:
+        (Counter with "read", "written", "removed" and "kept_booked" totals,
+         Counter of rejected rows per reason,
+         list of old slots kept in replace mode, see `_replace_slots`)
+    """
+    if kind not in ("doctors", "schedules"):
+        raise ValueError(f"Unknown roster kind: {kind} (expected 'doctors' or 'schedules')")
+
+    rejects_columns = None  # Header of the rejects file once the first rejected row is written
+    if rejects_path is not None:
+        open(rejects_path, "w").close()  # Start empty, so runs with different columns never share a header
+
+    stats, rejected, kept = Counter(), Counter(), []
+    if kind == "schedules" and replace:
+        kept = _replace_slots(conn, path, chunk_size, stats)
+
+    for chunk in read_chunks(path, chunk_size):
+        stats["read"] += len(chunk)
+
+        # One transaction per chunk: committed on success, rolled back on error
+        with conn:
+            if kind == "doctors":
+                clean, reasons = validate_doctors(chunk)
+                rows = clean[DOCTOR_COLUMNS].itertuples(index=False, name=None)
+                statement = UPSERT_DOCTOR
+            else:
+                clean, reasons = validate_schedules(conn, chunk)
+                rows = clean[["doctor_id", "day_of_week", "start_time", "end_time", "duration_hours"]] \
+                    .itertuples(index=False, name=None)
+                statement = UPSERT_SLOT
+            conn.executemany(statement, rows)
+
+        stats["written"] += len(clean)
+        rejected.update(reasons.tolist())
+        rejects_columns = _write_rejects(rejects_path, chunk, reasons, rejects_columns)
+
+    return stats, rejected, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import doctor rosters and weekly schedules.")
+    parser.add_argument("kind", choices=["doctors", "schedules"], help="Type of roster file")
+    parser.add_argument("path", help="CSV or JSONL file to import")
+    parser.add_argument("--db", default=db_path, help="SQLite database (default: data/appointment_system.db)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per batch transaction")
+    parser.add_argument("--rejects", default=None, help="CSV file to collect rejected rows (overwritten)")
+    parser.add_argument("--replace", action="store_true",
+                        help="Schedules only: remove each listed doctor's slots that the file does not contain")
+    args = parser.parse_args()
+    if args.replace and args.kind != "schedules":
+        parser.error("--replace only applies to schedules")
+
+    try:
+        conn = connect(args.db)
+        try:
+            stats, rejected, kept = import_roster(args.kind, args.path, conn, args.chunk_size, args.rejects, args.replace)
+        finally:
+            conn.close()
+    except (ValueError, OSError, pd.errors.ParserError) as error:
+        # Bad roster data, a missing/unreadable file or a malformed CSV/JSONL line
+        raise SystemExit(f"Import failed: {error}")
+
+    print(f"Read {stats['read']} rows, wrote {stats['written']}.")
+    for reason, count in rejected.most_common():
+        print(f"  rejected {count}: {reason}")
+    if args.replace:
+        print(f"Removed {stats['removed']} old slots no longer in the roster.")
+        if kept:
+            print(f"Kept {len(kept)} old slots with upcoming booked appointments; "
+                  "any new slot overlapping them was rejected:")
+            for availability_id, name, day, start, end, bookings in kept[:KEPT_LISTED]:
+                print(f"  slot {availability_id}: {name}, {day} {start}-{end} ({bookings} upcoming bookings)")
+            if len(kept) > KEPT_LISTED:
+                print(f"  ... and {len(kept) - KEPT_LISTED} more")
+    if args.kind == "doctors":
+        # router.py builds its doctor-name utterances from the database when the app starts
+        print("Restart the app to refresh the appointment route with the new doctor names.")
+
+
+# This code only runs if you execute this file directly (not when importing it)
+if __name__ == "__main__":
+    main()
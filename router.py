@@ -1,3 +1,7 @@
+# Standard library imports - for reading doctor names from the appointment database
+import sqlite3
+from pathlib import Path
+
 # Semantic routing - for intelligently routing user queries to the right handler
 from semantic_router import Route, SemanticRouter
 from semantic_router.encoders import HuggingFaceEncoder
@@ -119,6 +123,30 @@ appointment = Route(
     "The call got disconnected, what do I do?", "Reconnect me to my doctor.",
 ])
 
+# Doctor names in the utterances above are the original hand-loaded roster. Rosters imported with
+# roster_import.py change every week, so availability questions for the doctors currently in the
+# database are generated when the router is built (i.e. at app start)
+db_path = Path(__file__).parent.absolute() / "data" / "appointment_system.db"
+DOCTOR_UTTERANCE_TEMPLATES = ["when is {} available", "what are the timings for {}", "book an appointment with {}"]
+MAX_DOCTOR_UTTERANCES = 300  # Caps the number of utterances to encode so start-up stays fast as the roster grows
+
+def doctor_utterances(limit=MAX_DOCTOR_UTTERANCES):
+    """
+    Build one availability/booking utterance per doctor in the database, newest doctors first.
+    Returns an empty list if the database cannot be read, so routing still works on the static utterances.
+    """
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            names = [row[0] for row in conn.execute("SELECT name FROM doctors ORDER BY doctor_id DESC LIMIT ?", (limit,))]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return []
+    return [DOCTOR_UTTERANCE_TEMPLATES[i % len(DOCTOR_UTTERANCE_TEMPLATES)].format(name) for i, name in enumerate(names)]
+
+appointment.utterances.extend(u for u in doctor_utterances() if u not in appointment.utterances)
+
 # Define the "faq" route - handles general hospital information, services, and policies
 # This includes hospital timings, locations, insurance, billing, emergency services, and facilities
 faq = Route(